@@ -1,6 +1,6 @@
 # Licensed under a 3-clause BSD style license - see LICENSE.rst
+import functools
 import getpass
-import tempfile
 from packaging.version import Version
 
 import git
@@ -10,18 +10,26 @@ from ska_helpers import git_helpers, paths
 from ska_helpers.utils import get_owner
 
 CHANDRA_MODELS = paths.chandra_models_repo_path()
+CURRENT_USER = getpass.getuser()
 
 
+@functools.cache
+def chandra_models_exists():
+    return CHANDRA_MODELS.exists()
+
+
+@functools.cache
 def ska_ownership_ok():
     # Check that the OS and volume support file ownership
     # (not the case with shared directories on a Windows VM on parallels)
     # and that the chandra_models dir is owned by the current user
     try:
-        return get_owner(CHANDRA_MODELS) == getpass.getuser()
+        return get_owner(CHANDRA_MODELS) == CURRENT_USER
     except Exception:
         return False
 
 
+@functools.cache
 def git_version_old():
     # Is the git version too old to have the repo_safe feature?
     # The safe checking feature was added in git 2.35.2.
@@ -31,26 +39,25 @@ def git_version_old():
 
 
 @pytest.mark.skipif(
-    not CHANDRA_MODELS.exists(),
+    not chandra_models_exists(),
     reason="Chandra models dir is not there",
 )
 @pytest.mark.skipif(ska_ownership_ok(), reason="Chandra models dir ownership is OK")
 @pytest.mark.skipif(git_version_old(), reason="Git version is too old to care")
-def test_make_git_repo_safe(monkeypatch):
+def test_make_git_repo_safe(monkeypatch, tmp_path):
     # Clear the 'repo_safe' cache so that this test always has something to do.
     git_helpers.make_git_repo_safe.cache_clear()
 
-    with tempfile.TemporaryDirectory() as tempdir:
-        # temporarily set HOME to a temp dir so .gitconfig comes from there
-        monkeypatch.setenv("HOME", tempdir)
-        repo = git.Repo(CHANDRA_MODELS)
-        with pytest.raises(git.exc.GitCommandError):
-            # This statement fails with the error
-            #     fatal: detected dubious ownership
-            # unless the repo is marked safe in .gitconfig
-            repo.is_dirty()
-        with pytest.warns(UserWarning, match="Updating git config"):
-            # marke the repo safe and issue warning
-            git_helpers.make_git_repo_safe(CHANDRA_MODELS)
-        # success
+    # temporarily set HOME to a temp dir so .gitconfig comes from there
+    monkeypatch.setenv("HOME", str(tmp_path))
+    repo = git.Repo(CHANDRA_MODELS)
+    with pytest.raises(git.exc.GitCommandError):
+        # This statement fails with the error
+        #     fatal: detected dubious ownership
+        # unless the repo is marked safe in .gitconfig
         repo.is_dirty()
+    with pytest.warns(UserWarning, match="Updating git config"):
+        # marke the repo safe and issue warning
+        git_helpers.make_git_repo_safe(CHANDRA_MODELS)
+    # success
+    repo.is_dirty()
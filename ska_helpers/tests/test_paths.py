@@ -1,5 +1,6 @@
 # Licensed under a 3-clause BSD style license - see LICENSE.rst
 
+import itertools
 import os
 from pathlib import Path
 
@@ -8,9 +9,20 @@ import pytest
 from ska_helpers import paths
 
 
-@pytest.mark.parametrize("repo_source", ["default", "env", "kwargs"])
-@pytest.mark.parametrize("chandra_models_repo_dir", paths.CHANDRA_MODELS_ROOT_ENV_VARS)
-def test_chandra_models_paths(repo_source, chandra_models_repo_dir, monkeypatch):
+@pytest.fixture(
+    params=list(
+        itertools.product(
+            ["default", "env", "kwargs"], paths.CHANDRA_MODELS_ROOT_ENV_VARS
+        )
+    ),
+    ids="-".join,
+)
+def chandra_models_setup(request, monkeypatch):
+    """Set up the chandra_models repo root for each (repo_source, env var) case.
+
+    Returns the ``kwargs`` to pass to the path functions and the expected repo root.
+    """
+    repo_source, chandra_models_repo_dir = request.param
     if repo_source in ["env", "default"]:
         # For these two cases we need a clean env as a baseline in order to know the
         # expected result.
@@ -22,7 +34,8 @@ def test_chandra_models_paths(repo_source, chandra_models_repo_dir, monkeypatch)
         monkeypatch.setenv(chandra_models_repo_dir, str(root))
         kwargs = {}
     elif repo_source == "default":
-        root = Path(os.environ["SKA"]) / "data" / "chandra_models"
+        # Default chandra_models repo location when no override env var is set.
+        root = Path(os.environ["SKA"], "data", "chandra_models")
         kwargs = {}
     elif repo_source == "kwargs":
         root = Path("/", "bar", "chandra_models")
@@ -30,20 +43,37 @@ def test_chandra_models_paths(repo_source, chandra_models_repo_dir, monkeypatch)
     else:
         raise ValueError(f"Unexpected repo_source={repo_source}")
 
-    if repo_source == "kwargs":
-        repo = Path(root)
+    return kwargs, root
+
+
+def test_chandra_models_repo_path(chandra_models_setup):
+    kwargs, root = chandra_models_setup
+    if kwargs:
+        repo = Path(kwargs["repo_path"])
     else:
         repo = paths.chandra_models_repo_path()
     assert repo == root
 
+
+def test_chandra_models_path(chandra_models_setup):
+    kwargs, root = chandra_models_setup
     mdls = paths.chandra_models_path(**kwargs)
     assert mdls == root / "chandra_models"
 
+
+def test_aca_drift_model_path(chandra_models_setup):
+    kwargs, root = chandra_models_setup
     drift = paths.aca_drift_model_path(**kwargs)
-    assert drift == mdls / "aca_drift" / "aca_drift_model.json"
+    assert drift == root / "chandra_models" / "aca_drift" / "aca_drift_model.json"
+
 
+def test_aca_acq_prob_models_path(chandra_models_setup):
+    kwargs, root = chandra_models_setup
     acq_prob = paths.aca_acq_prob_models_path(**kwargs)
-    assert acq_prob == mdls / "aca_acq_prob"
+    assert acq_prob == root / "chandra_models" / "aca_acq_prob"
+
 
+def test_xija_models_path(chandra_models_setup):
+    kwargs, root = chandra_models_setup
     xija = paths.xija_models_path(**kwargs)
-    assert xija == mdls / "xija"
+    assert xija == root / "chandra_models" / "xija"
@@ -1,55 +1,128 @@
+import concurrent.futures
+import copy
 import functools
+import getpass
 import logging
 import os
 import pickle
+import re
+import threading
 import time
 from dataclasses import dataclass
 
-import agasc
 import numpy as np
 import pytest
 
-import ska_helpers.logging
+from ska_helpers import utils
 from ska_helpers.utils import (
     LazyDict,
     LazyVal,
     LRUDict,
     TypedDescriptor,
     convert_to_int_float_str,
+    get_owner_bulk,
     lru_cache_timed,
     random_radec_in_cone,
     set_log_level,
     temp_env_var,
 )
 
+NOT_A_STRING_RE = re.compile(r"input value must be a string, not float")
+REQUIRED_NONE_RE = re.compile(
+    r"attribute 'val_int' is required and cannot be set to None"
+)
+REQUIRED_AND_DEFAULT_RE = re.compile(
+    r"cannot set both 'required' and 'default' arguments"
+)
+
 
 def load_func(a, b, c=None):
     return {"a": a, "b": b, "c": c}
 
 
+def make_lazy_dict():
+    return LazyDict(load_func, 1, 2, c=3)
+
+
+# Lazy classes and how to get item "a" from each, where this triggers the load
+LAZY_ACCESS_CASES = (
+    pytest.param(LazyDict, lambda x: x["a"], id="lazy_dict"),
+    pytest.param(LazyVal, lambda x: x.val["a"], id="lazy_val"),
+)
+
+
 def test_lazy_dict_basic():
-    x = LazyDict(load_func, 1, 2, c=3)
+    # First access triggers the load, subsequent ones use the loaded dict.
+    x = make_lazy_dict()
     assert "a" in x
     assert "b" in x
     assert "c" in x
-
-    x = LazyDict(load_func, 1, 2, c=3)
     assert x == {"a": 1, "b": 2, "c": 3}
-
-    x = LazyDict(load_func, 1, 2, c=3)
     assert len(x) == 3
-
-    x = LazyDict(load_func, 1, 2, c=3)
     assert list(x) == ["a", "b", "c"]
-
-    x = LazyDict(load_func, 1, 2, c=3)
     assert list(x.values()) == [1, 2, 3]
 
 
-def test_lazy_dict_pickle():
-    x = LazyDict(load_func, 1, 2, c=3)
+@pytest.mark.parametrize(
+    "op, expected",
+    [
+        pytest.param(lambda x: "a" in x, True, id="contains"),
+        pytest.param(lambda x: x == {"a": 1, "b": 2, "c": 3}, True, id="eq"),
+        pytest.param(len, 3, id="len"),
+        pytest.param(list, ["a", "b", "c"], id="iter"),
+        pytest.param(lambda x: list(x.values()), [1, 2, 3], id="values"),
+    ],
+)
+def test_lazy_dict_first_access(op, expected):
+    # Each operation must trigger the load when it is the first access.
+    assert op(make_lazy_dict()) == expected
+
+
+@pytest.fixture(scope="session")
+def lazy_dict_pickled():
+    """Pickled bytes of a not-yet-loaded LazyDict."""
+    return pickle.dumps(make_lazy_dict())
+
+
+def test_lazy_dict_pickle(lazy_dict_pickled):
+    # Pickling or copying does not load, and the round trip is still lazy
+    x = make_lazy_dict()
+    pickle.dumps(x)
+    copy.copy(x)
+    assert not x._loaded
+
+    xpp = pickle.loads(lazy_dict_pickled)
+    assert type(xpp) is LazyDict
+    assert not xpp._loaded
+    assert xpp == {"a": 1, "b": 2, "c": 3}
+
+
+@pytest.mark.parametrize("protocol", range(pickle.HIGHEST_PROTOCOL + 1))
+def test_lazy_dict_after_load(protocol):
+    x = make_lazy_dict()
+    assert x["a"] == 1
+    # Still a LazyDict after loading and round-trips through pickle and copy
+    assert isinstance(x, LazyDict)
+    pickled = pickle.dumps(x, protocol=protocol)
+    assert b"_LoadedLazyDict" not in pickled
+    for xpp in (pickle.loads(pickled), copy.copy(x)):
+        assert isinstance(xpp, LazyDict)
+        assert xpp == x
+
+
+class DescribedLazyDict(LazyDict):
+    def describe(self):
+        return f"keys: {sorted(self)}"
+
+
+def test_lazy_dict_subclass():
+    # A subclass keeps its class and methods after loading and through a pickle
+    x = DescribedLazyDict(load_func, 1, 2, c=3)
+    assert x["a"] == 1
+    assert type(x) is DescribedLazyDict
     xpp = pickle.loads(pickle.dumps(x))
-    assert xpp == x
+    assert type(xpp) is DescribedLazyDict
+    assert xpp.describe() == "keys: ['a', 'b', 'c']"
 
 
 def test_lazy_val():
@@ -64,6 +137,82 @@ def test_lazy_val_pickle():
     assert xpp.val == {"a": 1, "b": 2, "c": 3}
 
 
+@pytest.mark.parametrize("cls, access", LAZY_ACCESS_CASES)
+def test_lazy_load_threads(cls, access):
+    # Concurrent first access from several threads calls load_func only once
+    calls = []
+
+    def slow_load_func():
+        calls.append(1)
+        time.sleep(0.05)
+        return {"a": 1}
+
+    x = cls(slow_load_func)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(access(x))) for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [1] * 8
+
+
+@pytest.mark.parametrize("cls, access", LAZY_ACCESS_CASES)
+def test_lazy_load_nested_threads(cls, access):
+    # A load_func that loads another lazy object in a worker thread does not deadlock
+    inner = cls(load_func, 1, 2)
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+    def outer_load_func():
+        return {"a": executor.submit(access, inner).result(timeout=5)}
+
+    outer = cls(outer_load_func)
+    try:
+        assert access(outer) == 1
+    finally:
+        executor.shutdown(wait=False)
+
+
+@pytest.mark.parametrize("cls, access", LAZY_ACCESS_CASES)
+def test_lazy_load_recursive(cls, access):
+    # A load_func that uses its own object fails instead of deadlocking. Run it in a
+    # thread so a deadlock fails the test instead of hanging.
+    def self_load_func():
+        return {"a": access(x)}
+
+    x = cls(self_load_func)
+    errors = []
+
+    def target():
+        try:
+            access(x)
+        except RecursionError as err:
+            errors.append(err)
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    assert len(errors) == 1
+
+
+@pytest.mark.parametrize("cls, access", LAZY_ACCESS_CASES)
+def test_lazy_load_fail_pickle(cls, access):
+    # The load lock left after a failed load is not pickled or copied
+    x = cls(load_func)  # Missing required args so the load fails
+    with pytest.raises(TypeError):
+        access(x)
+    assert "_lock" in x.__dict__
+
+    for xpp in (pickle.loads(pickle.dumps(x)), copy.copy(x)):
+        assert "_lock" not in xpp.__dict__
+        assert xpp._load_func is load_func
+
+
 def test_lru_cache_timed():
     @lru_cache_timed(maxsize=128, timeout=0.1)
     def test(a):
@@ -84,70 +233,256 @@ def test_lru_cache_timed():
     assert test.cache_info().currsize == 0
 
 
-def test_lru_dict():
-    # Create an LRUDict with capacity 2
+@pytest.mark.parametrize(
+    "ops, keys, absent",
+    [
+        pytest.param(
+            [("set", "a", 1), ("set", "b", 2)],
+            ["a", "b"],
+            [],
+            id="under_capacity",
+        ),
+        pytest.param(
+            [("set", "a", 1), ("set", "b", 2), ("set", "c", 3)],
+            ["b", "c"],
+            ["a"],
+            id="evict_oldest",
+        ),
+        pytest.param(
+            [("set", "a", 1), ("set", "b", 2), ("get", "a"), ("set", "c", 3)],
+            ["a", "c"],
+            ["b"],
+            id="get_refreshes",
+        ),
+        pytest.param(
+            [("set", "a", 1), ("set", "b", 2), ("set", "a", 10), ("set", "c", 3)],
+            ["a", "c"],
+            ["b"],
+            id="set_refreshes",
+        ),
+        pytest.param(
+            [
+                ("set", "a", 1),
+                ("set", "b", 2),
+                ("get", "a"),
+                ("get", "b"),
+                ("set", "c", 3),
+                ("get", "b"),
+                ("get", "c"),
+                ("get", "c"),
+                ("get", "b"),
+                ("set", "d", 4),
+            ],
+            ["b", "d"],
+            ["a", "c"],
+            id="access_sequence",
+        ),
+    ],
+)
+def test_lru_dict(ops, keys, absent):
+    # Create an LRUDict with capacity 2 and apply the operations, keeping track of
+    # the expected value of every key that was set.
     d = LRUDict(2)
+    values = {}
+    for op, key, *val in ops:
+        if op == "set":
+            d[key] = values[key] = val[0]
+        else:
+            assert d[key] == values[key]
 
-    # Add two items to the dict
-    d["a"] = 1
-    d["b"] = 2
+    # Keys are ordered from least to most recently used
+    assert list(d.keys()) == keys
 
-    # Access the items in order
-    assert d["a"] == 1
-    assert d["b"] == 2
+    for key in keys:
+        assert d[key] == values[key]
 
-    # Add a third item to the dict
-    d["c"] = 3
+    for key in absent:
+        with pytest.raises(KeyError):
+            d[key]
+
+
+def test_lru_dict_get_set_many():
+    d = LRUDict(3)
+    d.set_many({"a": 1, "b": 2})
+    d.set_many([("c", 3), ("a", 10), ("d", 4)])
+    # "b" was least recently used once "a" was set again
+    assert list(d.keys()) == ["c", "a", "d"]
+
+    assert d.get_many(["a", "c"]) == [10, 3]
+    assert list(d.keys()) == ["d", "a", "c"]
 
-    # The oldest item ("a") should have been evicted
     with pytest.raises(KeyError):
-        d["a"]
+        d.get_many(["a", "b"])
 
-    # Access the remaining items in order
-    assert d["b"] == 2
-    assert d["c"] == 3
+    # More items than capacity keeps the last ones
+    d.set_many({str(ii): ii for ii in range(5)})
+    assert list(d.items()) == [("2", 2), ("3", 3), ("4", 4)]
 
-    # Access the items in reverse order
-    assert d["c"] == 3
-    assert d["b"] == 2
 
-    # Add a fourth item to the dict
-    d["d"] = 4
+@pytest.fixture
+def fake_clock(monkeypatch):
+    """Replace time.monotonic with a clock that only advances when told to.
+
+    Returns a one-element list holding the current time, which tests increment.
+    """
+    clock = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+    return clock
+
 
-    # The oldest item ("c") should have been evicted
+def test_lru_dict_ttl(fake_clock):
+    d = LRUDict(3, ttl=0.1)
+    d["a"] = 1
+    d["b"] = 2
+    fake_clock[0] += 0.11
+
+    # Expired items are evicted before the least recently used item ("c")
+    d["c"] = 3
+    d["d"] = 4
+    d["e"] = 5
+    assert list(d.keys()) == ["c", "d", "e"]
+    assert "a" not in d
     with pytest.raises(KeyError):
-        d["c"]
+        d["b"]
 
-    # Access the remaining items in order
-    assert d["b"] == 2
-    assert d["d"] == 4
+    # Setting an item again resets its expiration
+    fake_clock[0] += 0.06
+    d["c"] = 30
+    fake_clock[0] += 0.06
+    assert d["c"] == 30
+    assert "d" not in d
+    assert list(d.keys()) == ["c"]
 
 
-def test_temp_env_var():
+def test_lru_dict_ttl_dict_methods(fake_clock):
+    d = LRUDict(3, ttl=0.1)
+    d["a"] = 1
+    d["b"] = 2
+    assert d.setdefault("c", 3) == 3
+    assert d.setdefault("a", 10) == 1
+    fake_clock[0] += 0.11
+
+    # Expired items are not returned by the dict methods
+    assert d.get("a") is None
+    assert d.pop("b", None) is None
+    assert d.setdefault("c", 30) == 30
+
+    # Items added by setdefault expire too
+    fake_clock[0] += 0.11
+    assert d.get("c") is None
+
+    d["d"] = 4
+    d.clear()
+    assert len(d) == 0
+    assert d._expires == {}
+    assert d._expires_heap == []
+
+
+@pytest.mark.parametrize("ttl", [None, 0.1])
+@pytest.mark.parametrize(
+    "copier",
+    [lambda d: pickle.loads(pickle.dumps(d)), copy.copy, LRUDict.copy],
+    ids=["pickle", "copy", "copy_method"],
+)
+def test_lru_dict_copy(fake_clock, copier, ttl):
+    d = LRUDict(200, ttl=ttl)
+    for key in range(150):
+        d[key] = key
+    d[0]
+    dc = copier(d)
+    assert type(dc) is type(d)
+    assert (dc.capacity, dc.ttl) == (200, ttl)
+    assert list(dc.items()) == list(d.items())
+
+    # The copy is independent, including expiration of items
+    fake_clock[0] += 0.06
+    dc["new"] = 1
+    d["other"] = 2
+    assert "new" not in d
+    assert "other" not in dc
+    if ttl is not None:
+        fake_clock[0] += 0.06
+        assert 0 not in d
+        assert 0 not in dc
+        assert list(d.keys()) == ["other"]
+        assert list(dc.keys()) == ["new"]
+
+
+class TaggedLRUDict(LRUDict):
+    def __init__(self, *, tag, ttl=None):
+        super().__init__(2, ttl=ttl)
+        self.tag = tag
+
+    def newest(self):
+        return next(reversed(self))
+
+
+@pytest.mark.parametrize("ttl", [None, 0.1])
+def test_lru_dict_subclass(fake_clock, ttl):
+    # A subclass keeps its class, methods and attributes with a ttl and through a
+    # pickle or copy, even though its __init__ has a different signature.
+    d = TaggedLRUDict(tag="x", ttl=ttl)
+    d["a"] = 1
+    d["b"] = 2
+    assert isinstance(d, TaggedLRUDict)
+    assert d.newest() == "b"
+    for dc in (pickle.loads(pickle.dumps(d)), copy.copy(d), d.copy()):
+        assert type(dc) is type(d)
+        assert dc.newest() == "b"
+        assert (dc.tag, dc.capacity, dc.ttl) == ("x", 2, ttl)
+    if ttl is not None:
+        fake_clock[0] += 0.11
+        assert "a" not in d
+
+
+def test_get_owner_bulk(tmp_path):
+    test_helper = pytest.importorskip("testr.test_helper")
+    if test_helper.is_windows():
+        pytest.skip("Owner names are cached by SID on Windows")
+
+    paths = [tmp_path / f"file{ii}" for ii in range(3)]
+    for path in paths:
+        path.touch()
+    paths.append(tmp_path)
+
+    # All paths have the same owner, so the name is looked up once and then cached
+    utils._owner_name_from_uid.cache_clear()
+    owners = get_owner_bulk(paths)
+    assert owners == [getpass.getuser()] * 4
+    cache_info = utils._owner_name_from_uid.cache_info()
+    assert (cache_info.misses, cache_info.hits) == (1, 3)
+
+
+def test_temp_env_var(monkeypatch):
     name = "ASDF1234_asdfsdaf_982398239324223423_a2323423424211111_adfaASDfaSDFASDF"
-    # Check that the environment variable is initially unset
-    assert os.environ.get(name) is None
+    # Ensure the environment variable is initially unset
+    monkeypatch.delenv(name, raising=False)
 
     # Set the environment variable using the context manager
     with temp_env_var(name, "my_value"):
-        assert os.environ.get(name) == "my_value"
+        assert os.environ[name] == "my_value"
 
     # Check that the environment variable is unset after the context manager exits
-    assert os.environ.get(name) is None
-
+    assert name not in os.environ
 
-cases = [
-    (" 1 ", int, 1),
-    ("1e5", float, 1e5),
-    (" 01.01e5 ", float, 1.01e5),
-    ("1.0a5", str, "1.0a5"),
-    ("0472", int, 472),
-    ("-0472", int, -472),
-    (" 'test string' ", str, "test string"),
-    (' "test string" ', str, "test string"),
-    (" test string", str, " test string"),
-    ("[1, 2, 3]", str, "[1, 2, 3]"),
-]
+    # Deleting the variable within the block is allowed
+    with temp_env_var(name, "my_value"):
+        del os.environ[name]
+    assert name not in os.environ
+
+
+cases = (
+    pytest.param(" 1 ", int, 1, id="int_whitespace"),
+    pytest.param("1e5", float, 1e5, id="float_exp"),
+    pytest.param(" 01.01e5 ", float, 1.01e5, id="float_leading_zero"),
+    pytest.param("1.0a5", str, "1.0a5", id="str_not_float"),
+    pytest.param("0472", int, 472, id="int_leading_zero"),
+    pytest.param("-0472", int, -472, id="int_negative_leading_zero"),
+    pytest.param(" 'test string' ", str, "test string", id="str_single_quoted"),
+    pytest.param(' "test string" ', str, "test string", id="str_double_quoted"),
+    pytest.param(" test string", str, " test string", id="str_unquoted"),
+    pytest.param("[1, 2, 3]", str, "[1, 2, 3]", id="str_list_literal"),
+)
 
 
 @pytest.mark.parametrize("value, type_, expected", cases)
@@ -158,7 +493,7 @@ def test_convert_to_int_float_str(value, type_, expected):
 
 
 def test_convert_to_int_float_str_err():
-    with pytest.raises(TypeError, match="input value must be a string, not float"):
+    with pytest.raises(TypeError, match=NOT_A_STRING_RE):
         convert_to_int_float_str(1.05)
 
 
@@ -169,11 +504,20 @@ class IntDescriptor(TypedDescriptor):
 IntDescriptorFromKwargs = functools.partial(TypedDescriptor, cls=int)
 
 
-@pytest.mark.parametrize("cls_descriptor", [IntDescriptor, IntDescriptorFromKwargs])
-def test_int_descriptor_not_required_no_default(cls_descriptor):
+@functools.cache
+def make_int_class(cls_descriptor, **kwargs):
+    """Make (once) a dataclass with ``val_int`` attribute using ``cls_descriptor``."""
+
     @dataclass
     class MyClass:
-        val_int: int | None = cls_descriptor()
+        val_int: int | None = cls_descriptor(**kwargs)
+
+    return MyClass
+
+
+@pytest.mark.parametrize("cls_descriptor", [IntDescriptor, IntDescriptorFromKwargs])
+def test_int_descriptor_not_required_no_default(cls_descriptor):
+    MyClass = make_int_class(cls_descriptor)
 
     obj = MyClass()
     assert obj.val_int is None
@@ -185,29 +529,21 @@ def test_int_descriptor_not_required_no_default(cls_descriptor):
 
 @pytest.mark.parametrize("cls_descriptor", [IntDescriptor, IntDescriptorFromKwargs])
 def test_int_descriptor_is_required(cls_descriptor):
-    @dataclass
-    class MyClass:
-        val_int: int = cls_descriptor(required=True)
+    MyClass = make_int_class(cls_descriptor, required=True)
 
     obj = MyClass(10.2)
     assert obj.val_int == 10
 
-    with pytest.raises(
-        ValueError, match="attribute 'val_int' is required and cannot be set to None"
-    ):
+    with pytest.raises(ValueError, match=REQUIRED_NONE_RE):
         obj.val_int = None
 
-    with pytest.raises(
-        ValueError, match="attribute 'val_int' is required and cannot be set to None"
-    ):
+    with pytest.raises(ValueError, match=REQUIRED_NONE_RE):
         MyClass()
 
 
 @pytest.mark.parametrize("cls_descriptor", [IntDescriptor, IntDescriptorFromKwargs])
 def test_int_descriptor_has_default(cls_descriptor):
-    @dataclass
-    class MyClass:
-        val_int: int = cls_descriptor(default=10.5)
+    MyClass = make_int_class(cls_descriptor, default=10.5)
 
     # Accessing the class attribute returns original default value (used by dataclass).
     assert MyClass.val_int == 10.5
@@ -222,50 +558,81 @@ def test_int_descriptor_has_default(cls_descriptor):
 
 @pytest.mark.parametrize("cls_descriptor", [IntDescriptor, IntDescriptorFromKwargs])
 def test_int_descriptor_is_required_has_default_exception(cls_descriptor):
-    with pytest.raises(
-        ValueError, match="cannot set both 'required' and 'default' arguments"
-    ):
-
-        @dataclass
-        class MyClass:
-            quat: int = cls_descriptor(default=30, required=True)
+    with pytest.raises(ValueError, match=REQUIRED_AND_DEFAULT_RE):
+        make_int_class(cls_descriptor, default=30, required=True)
 
 
 def test_set_log_level():
-    logger = ska_helpers.logging.basic_logger("test_utils", level="DEBUG")
+    from ska_helpers.logging import basic_logger
+
+    logger = basic_logger("test_utils", level="DEBUG")
 
     assert logger.level == logging.DEBUG
     assert len(logger.handlers) == 1
-    for hdlr in logger.handlers:
-        assert hdlr.level == 0
+    assert logger.handlers[0].level == 0
 
     with set_log_level(logger, "INFO"):
         assert logger.level == logging.INFO
         assert len(logger.handlers) == 1
-        for hdlr in logger.handlers:
-            assert hdlr.level == logging.INFO
+        assert logger.handlers[0].level == logging.INFO
 
     assert logger.level == logging.DEBUG
     assert len(logger.handlers) == 1
-    for hdlr in logger.handlers:
-        assert hdlr.level == 0
+    assert logger.handlers[0].level == 0
 
 
-def test_random_radec_in_cone_scalar():
+@pytest.fixture
+def seeded_random():
+    """Seed the global numpy RNG with 0 and restore the original state afterward."""
+    state = np.random.get_state()
     np.random.seed(0)
-    ra, dec = random_radec_in_cone(10, 20, angle=5)
-    assert np.isclose(ra, 8.6733489)
-    assert np.isclose(dec, 15.964518)
+    yield
+    np.random.set_state(state)
+
+
+@pytest.mark.parametrize(
+    "size, ra_exp, dec_exp",
+    [
+        pytest.param(None, 8.6733489, 15.964518, id="scalar"),
+        pytest.param(
+            2, [8.77992603, 6.18623754], [16.29571322, 19.15880785], id="size_2"
+        ),
+    ],
+)
+def test_random_radec_in_cone_values(seeded_random, size, ra_exp, dec_exp):
+    ra, dec = random_radec_in_cone(10, 20, angle=5, size=size)
+    assert np.shape(ra) == np.shape(ra_exp)
+    assert np.allclose(ra, ra_exp)
+    assert np.allclose(dec, dec_exp)
 
 
-def test_random_radec_in_cone_size_values():
-    np.random.seed(0)
-    ra, dec = random_radec_in_cone(10, 20, angle=5, size=2)
-    assert np.allclose(ra, [8.77992603, 6.18623754])
-    assert np.allclose(dec, [16.29571322, 19.15880785])
+def test_random_radec_in_cone_multidim_size(seeded_random):
+    ra, dec = random_radec_in_cone(10, 20, angle=5, size=(3, 4))
+    assert ra.shape == dec.shape == (3, 4)
+
+    # Angular distance from the cone center via the dot product of unit vectors
+    ra, dec = np.radians(ra), np.radians(dec)
+    ra0, dec0 = np.radians([10, 20])
+    cos_dist = np.sin(dec) * np.sin(dec0) + np.cos(dec) * np.cos(dec0) * np.cos(
+        ra - ra0
+    )
+    assert np.all(np.degrees(np.arccos(np.clip(cos_dist, -1, 1))) < 5)
+
 
+@pytest.fixture(scope="session")
+def cone_sample():
+    """Random sample of 10000 points in a 5 deg cone and their distance from center."""
+    agasc = pytest.importorskip("agasc")
 
-def test_random_radec_in_cone_size_angle():
+    state = np.random.get_state()
     np.random.seed(0)
-    ra, dec = random_radec_in_cone(10, 20, angle=5, size=10000)
-    assert np.all(agasc.sphere_dist(ra, dec, 10, 20) < 5)
+    try:
+        ra, dec = random_radec_in_cone(10, 20, angle=5, size=10000)
+    finally:
+        np.random.set_state(state)
+    return ra, dec, agasc.sphere_dist(ra, dec, 10, 20)
+
+
+def test_random_radec_in_cone_size_angle(cone_sample):
+    _, _, dist = cone_sample
+    assert np.all(dist < 5)
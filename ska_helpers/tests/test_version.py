@@ -0,0 +1,36 @@
+# Licensed under a 3-clause BSD style license - see LICENSE.rst
+
+import pytest
+
+from ska_helpers.version import parse_version
+
+
+@pytest.mark.parametrize(
+    "version, expected",
+    [
+        pytest.param("4.5", (4, 5, None, None, None, None, None), id="major_minor"),
+        pytest.param("4.5.1", (4, 5, 1, None, None, None, None), id="release"),
+        pytest.param(
+            "4.5.1.dev3+g1234abc.d20200101",
+            (4, 5, 1, 3, "g", "1234abc", "20200101"),
+            id="dev_dirty",
+        ),
+        pytest.param(
+            "0.1.dev43+g966c491.d20240704",
+            (0, 1, None, 43, "g", "966c491", "20240704"),
+            id="dev_no_patch",
+        ),
+        # Only the leading part of the version needs to match
+        pytest.param("4.5.1.post2", (4, 5, 1, None, None, None, None), id="post"),
+        # Separators must be literal dots
+        pytest.param("4-5", (4, None, None, None, None, None, None), id="not_dot"),
+    ],
+)
+def test_parse_version(version, expected):
+    keys = ["major", "minor", "patch", "distance", "letter", "hash", "date"]
+    assert parse_version(version) == dict(zip(keys, expected, strict=True))
+
+
+def test_parse_version_fail():
+    with pytest.raises(RuntimeError, match="could not be parsed"):
+        parse_version("not-a-version")
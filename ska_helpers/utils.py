@@ -2,13 +2,19 @@
 
 import contextlib
 import functools
+import heapq
+import logging
 import os
+import re
+import threading
+import time
 from collections import OrderedDict
 
 import numpy as np
 
 __all__ = [
     "get_owner",
+    "get_owner_bulk",
     "LazyDict",
     "LazyVal",
     "LRUDict",
@@ -34,20 +40,29 @@ def set_log_level(logger, level=None):
         "ERROR", "CRITICAL", or an integer value from the ``logging`` module. If level
         is None (default), the log level is not changed.
     """
-    orig_levels = {}
+    # Only change (and later restore) the logger and handlers that are not already at
+    # the requested level. In particular Logger.setLevel() clears the logging cache.
+    orig_levels = []
     if level is not None:
-        orig_levels[logger] = logger.level
-        logger.setLevel(level)
-        for handler in logger.handlers:
-            orig_levels[handler] = handler.level
-            handler.setLevel(level)
+        for log_obj in (logger, *logger.handlers):
+            orig_level = log_obj.level
+            if orig_level != level and logging.getLevelName(orig_level) != level:
+                orig_levels.append((log_obj, orig_level))
+                log_obj.setLevel(level)
     try:
         yield
     finally:
-        for log_obj, orig_level in orig_levels.items():
+        for log_obj, orig_level in orig_levels:
             log_obj.setLevel(orig_level)
 
 
+@functools.cache
+def _is_windows():
+    from testr import test_helper
+
+    return test_helper.is_windows()
+
+
 def get_owner(path):
     """
     Returns the owner of a file or directory.
@@ -63,11 +78,7 @@ def get_owner(path):
         The name of the owner of the file or directory.
     """
 
-    from pathlib import Path
-
-    from testr import test_helper
-
-    if test_helper.is_windows():
+    if _is_windows():
         import win32security
 
         # Suggested by copilot chat, seems to
@@ -75,12 +86,74 @@ def get_owner(path):
             str(path), win32security.OWNER_SECURITY_INFORMATION
         )
         owner_sid = security_descriptor.GetSecurityDescriptorOwner()
-        owner_name, _, _ = win32security.LookupAccountSid(None, owner_sid)
+        owner_name = _owner_name_from_sid(
+            win32security.ConvertSidToStringSid(owner_sid)
+        )
     else:
-        owner_name = Path(path).owner()
+        # Same as Path(path).owner() without creating a Path object
+        owner_name = _owner_name_from_uid(os.stat(path).st_uid)
+    return owner_name
+
+
+def get_owner_bulk(paths):
+    """
+    Returns the owners of a sequence of files or directories.
+
+    This is equivalent to ``[get_owner(path) for path in paths]``. Each path is
+    stat'ed once and the owner name lookup (which may query a remote user database)
+    is cached by user ID, so this is efficient for many files with few owners.
+
+    Parameters:
+    -----------
+    paths : iterable of str or pathlib.Path
+        The paths to the files or directories.
+
+    Returns:
+    --------
+    list of str
+        The names of the owners of the files or directories.
+    """
+    return [get_owner(path) for path in paths]
+
+
+@functools.lru_cache(maxsize=256)
+def _owner_name_from_uid(uid):
+    import pwd
+
+    return pwd.getpwuid(uid).pw_name
+
+
+@functools.lru_cache(maxsize=256)
+def _owner_name_from_sid(sid_string):
+    import win32security
+
+    owner_sid = win32security.ConvertStringSidToSid(sid_string)
+    owner_name, _, _ = win32security.LookupAccountSid(None, owner_sid)
     return owner_name
 
 
+# Marker for a lazy value that has not yet been loaded
+_NOT_LOADED = object()
+
+
+def _get_load_lock(obj):
+    """Get the per-instance lock used to run ``load_func`` only once across threads.
+
+    The lock is created on first use since a lock cannot be pickled, and
+    ``dict.setdefault`` ensures that concurrent callers all get the same lock. It is
+    reentrant so that a ``load_func`` which uses its own object fails with
+    RecursionError instead of deadlocking.
+    """
+    return obj.__dict__.setdefault("_lock", threading.RLock())
+
+
+def _get_lazy_state(obj):
+    """Get instance state for pickling, without the lock which cannot be pickled."""
+    state = obj.__dict__.copy()
+    state.pop("_lock", None)
+    return state
+
+
 def _lazy_load_wrap(unbound_method):
     @functools.wraps(unbound_method)
     def wrapper(self, *args, **kwargs):
@@ -125,6 +198,9 @@ class LazyVal:
         Keyword arguments for ``load_func``
     """
 
+    # Class-level default so instances (including old pickles) start out not loaded
+    _val = _NOT_LOADED
+
     def __init__(self, load_func, *args, **kwargs):
         self._load_func = load_func
         self._args = args
@@ -133,15 +209,25 @@ class LazyVal:
 
     @property
     def val(self):
-        if not hasattr(self, "_val"):
-            self._val = self._load_func(*self._args, **self._kwargs)
+        val = self._val
+        if val is _NOT_LOADED:
+            with _get_load_lock(self):
+                # Check again since another thread may have loaded while we waited
+                val = self._val
+                if val is _NOT_LOADED:
+                    val = self._val = self._load_func(*self._args, **self._kwargs)
 
-            # Delete these so serialization always works (pickling a func can fail)
-            del self._load_func
-            del self._args
-            del self._kwargs
+                    # Delete these so serialization always works (pickling a func
+                    # can fail)
+                    del self._load_func
+                    del self._args
+                    del self._kwargs
+                    self.__dict__.pop("_lock", None)
 
-        return self._val
+        return val
+
+    def __getstate__(self):
+        return _get_lazy_state(self)
 
 
 class LazyDict(dict):
@@ -186,21 +272,34 @@ class LazyDict(dict):
 
     def _load(self):
         if not self._loaded:
-            self.update(self._load_func(*self._args, **self._kwargs))
-            self._loaded = True
-
-            # Delete these so serialization always works (pickling a func can fail)
-            del self._load_func
-            del self._args
-            del self._kwargs
-
-    def __getitem__(self, item):
-        try:
-            return super().__getitem__(item)
-        except KeyError:
-            self._load()
-            return super().__getitem__(item)
-
+            with _get_load_lock(self):
+                # Check again since another thread may have loaded while we waited
+                if not self._loaded:
+                    self.update(self._load_func(*self._args, **self._kwargs))
+                    self._loaded = True
+
+                    # Delete these so serialization always works (pickling a func
+                    # can fail)
+                    del self._load_func
+                    del self._args
+                    del self._kwargs
+                    self.__dict__.pop("_lock", None)
+
+        # Now that the dict is loaded switch to a class that uses the dict methods
+        # directly, so there is no lazy-load overhead on subsequent access. This is
+        # skipped for subclasses so their own methods and overrides are kept.
+        if type(self) is LazyDict:
+            self.__class__ = _LoadedLazyDict
+
+    def __reduce_ex__(self, protocol):
+        # Pickle and copy without loading. This uses dict.items() directly since the
+        # wrapped items() would load. A loaded instance is pickled as a LazyDict so
+        # pickles do not depend on the private _LoadedLazyDict class.
+        cls = LazyDict if type(self) is _LoadedLazyDict else type(self)
+        state = _get_lazy_state(self)
+        return dict.__new__, (cls,), state, None, iter(dict.items(self))
+
+    __getitem__ = _lazy_load_wrap(dict.__getitem__)
     __contains__ = _lazy_load_wrap(dict.__contains__)
     __eq__ = _lazy_load_wrap(dict.__eq__)
     __ge__ = _lazy_load_wrap(dict.__ge__)
@@ -224,6 +323,37 @@ class LazyDict(dict):
     values = _lazy_load_wrap(dict.values)
 
 
+class _LoadedLazyDict(LazyDict):
+    """LazyDict that has been loaded and now behaves exactly like a dict.
+
+    The lazy-load wrappers of ``LazyDict`` are replaced by the unbound ``dict``
+    methods, which Python maps straight to the C-level dict slots.
+    """
+
+    __getitem__ = dict.__getitem__
+    __contains__ = dict.__contains__
+    __eq__ = dict.__eq__
+    __ge__ = dict.__ge__
+    __gt__ = dict.__gt__
+    __iter__ = dict.__iter__
+    __le__ = dict.__le__
+    __len__ = dict.__len__
+    __lt__ = dict.__lt__
+    __ne__ = dict.__ne__
+    __repr__ = dict.__repr__
+    __reversed__ = dict.__reversed__
+    __sizeof__ = dict.__sizeof__
+    __str__ = dict.__str__
+    copy = dict.copy
+    get = dict.get
+    items = dict.items
+    keys = dict.keys
+    pop = dict.pop
+    popitem = dict.popitem
+    setdefault = dict.setdefault
+    values = dict.values
+
+
 def lru_cache_timed(maxsize=128, typed=False, timeout=3600):
     """LRU cache decorator where the cache expires after ``timeout`` seconds.
 
@@ -245,24 +375,33 @@ def lru_cache_timed(maxsize=128, typed=False, timeout=3600):
     timeout : int, float
         Clear cache after ``timeout`` seconds from last clear
     """
-    import time
+    # Use a monotonic clock so the cache lifetime is not affected by system clock
+    # changes.
+    monotonic = time.monotonic
 
     def _wrapper(func):
-        next_update = time.time() - 1  # Force cache reset first time
+        next_update = monotonic() - 1  # Force cache reset first time
+        # Lock so that threads reaching expiry at the same time clear the cache once
+        expiry_lock = threading.Lock()
         # Apply @lru_cache to f
         func = functools.lru_cache(maxsize=maxsize, typed=typed)(func)
 
         @functools.wraps(func)
         def _wrapped(*args, **kwargs):
-            clear_cache_if_expired()
+            # Inline the expiry check for speed, only calling out when expired
+            if monotonic() >= next_update:
+                clear_cache_if_expired()
             return func(*args, **kwargs)
 
         def clear_cache_if_expired():
             nonlocal next_update
-            now = time.time()
+            now = monotonic()
             if now >= next_update:
-                func.cache_clear()
-                next_update = now + timeout
+                with expiry_lock:
+                    # Check again since another thread may have cleared while we waited
+                    if now >= next_update:
+                        func.cache_clear()
+                        next_update = now + timeout
 
         def cache_info():
             """Report cache statistics"""
@@ -292,9 +431,9 @@ def random_radec_in_cone(
         Dec in degrees of the center of the cone.
     angle : float
         The radius of the cone in degrees.
-    size : int, optional
-        The number of random coordinates to generate. If not specified, a single
-        coordinate is generated.
+    size : int or tuple of int, optional
+        The number (or output shape) of random coordinates to generate. If not
+        specified, a single coordinate is generated.
 
     Returns
     -------
@@ -303,35 +442,47 @@ def random_radec_in_cone(
     dec_rand : np.ndarray
         Random Dec values in degrees.
     """
-    import chandra_aca.transform as cat
     from Quaternion import Quat
 
     # Convert input angles from degrees to radians
     angle_rad = np.radians(angle)
 
-    # Generate a random azimuthal angle (phi) between 0 and 2π
-    phi = np.random.uniform(0, 2 * np.pi, size=size)
+    # Draw two sets of uniform [0, 1) values in one call. Since numpy fills the array
+    # in order, this gives the same values as two sequential calls with ``size``.
+    shape = (2,) if size is None else (2, *np.atleast_1d(size))
+    uniforms = np.random.random_sample(shape)
 
-    # Generate a random polar angle (theta) within the specified angle from the north pole
-    u = np.random.uniform(0, 1, size=size)
-    theta = np.arccos(1 - u * (1 - np.cos(angle_rad)))
+    # Generate a random azimuthal angle (phi) between 0 and 2π
+    phi = 2 * np.pi * uniforms[0]
 
-    # Generate vectors around pole (dec=90)
-    ra_rot = np.degrees(phi)
-    dec_rot = 90 - np.degrees(theta)
-    eci = cat.radec_to_eci(ra_rot, dec_rot)
+    # Generate a random polar angle (theta) within the specified angle from the north
+    # pole. Only cos(theta) and sin(theta) are needed for the unit vectors.
+    u = uniforms[1]
+    cos_theta = 1 - u * (1 - np.cos(angle_rad))
+    sin_theta = np.sqrt(1 - cos_theta**2)
 
-    # Swap x and z axes to get vectors centered around RA=0 ad Dec=0
-    eci[..., [0, 2]] = eci[..., [2, 0]]
+    # Unit vectors around pole (dec=90) with x and z axes swapped so they are centered
+    # around RA=0 and Dec=0.
+    eci = np.stack([cos_theta, np.sin(phi) * sin_theta, np.cos(phi) * sin_theta])
 
     # Now rotate the random vectors to be centered about the desired RA and Dec.
+    # Rotate along the vector component axis, which works for any shape of ``size``.
     q = Quat([ra, dec, 0])
-    eci_rot = q.transform @ eci.T
-    ra_rand, dec_rand = cat.eci_to_radec(eci_rot.T)
+    x, y, z = np.tensordot(q.transform, eci, axes=1)
+    ra_rand = np.degrees(np.arctan2(y, x)) % 360
+    dec_rand = np.degrees(np.arctan2(z, np.hypot(x, y)))
 
     return ra_rand, dec_rand
 
 
+# Unbound OrderedDict methods used in LRUDict. Calling these directly is notably
+# faster than going through super() and bound method lookup on every access.
+_odict_contains = OrderedDict.__contains__
+_odict_getitem = OrderedDict.__getitem__
+_odict_setitem = OrderedDict.__setitem__
+_odict_move_to_end = OrderedDict.move_to_end
+
+
 class LRUDict(OrderedDict):
     """
     Dict that maintains a fixed capacity and evicts least recently used item when full.
@@ -355,28 +506,217 @@ class LRUDict(OrderedDict):
             ...
         KeyError: 'a'
 
+    If ``ttl`` is set then each item also expires ``ttl`` seconds after it was last
+    set. Expired items are removed on the next item access, ``in`` test or
+    assignment, and are evicted in preference to the least recently used item.
+    Until then they are still included by ``len()`` and iteration.
+
     Parameters:
     -----------
     capacity : int, optional
         The maximum number of items that the dictionary can hold. Defaults to 128.
+    ttl : int, float, None, optional
+        Time to live (sec) of each item after it is set. Defaults to None (no expiry).
     """
 
-    def __init__(self, capacity=128):
+    def __init__(self, capacity=128, ttl=None):
         super().__init__()
         self.capacity = capacity
+        self.ttl = ttl
+        self._init_ttl()
+
+    def _init_ttl(self):
+        if self.ttl is not None:
+            # Switch to a subclass that handles expiration so the default no-TTL
+            # case has no extra overhead.
+            self.__class__ = _timed_lru_dict_class(type(self))
+            self._init_expires()
 
     def __getitem__(self, key):
-        value = super().__getitem__(key)
-        self.move_to_end(key)
+        value = _odict_getitem(self, key)
+        _odict_move_to_end(self, key)
         return value
 
     def __setitem__(self, key, value):
-        if key in self:
-            self.move_to_end(key)
+        existed = _odict_contains(self, key)
+        _odict_setitem(self, key, value)
+        if existed:
+            # Updating an existing key makes it the most recently used
+            _odict_move_to_end(self, key)
+        elif len(self) > self.capacity:
+            # New key was appended at the end so evict the least recently used
+            self.popitem(last=False)
+
+    def __reduce__(self):
+        # Pickle the items (in LRU order) as part of the state so __setstate__ can
+        # set them after capacity and ttl are restored. The OrderedDict default sets
+        # the items before the state. Expiration state is not pickled and is set up
+        # afresh, with a full ttl for each item.
+        cls = getattr(type(self), "_lru_class", type(self))
+        state = {
+            key: val
+            for key, val in self.__dict__.items()
+            if key not in ("_expires", "_expires_heap", "_expires_count")
+        }
+        return OrderedDict.__new__, (cls,), (state, list(self.items()))
+
+    def __setstate__(self, state):
+        if isinstance(state, dict):
+            # Pickle from the OrderedDict default reduce, with the items already set
+            state, items = state, ()
+        else:
+            state, items = state
+        self.__dict__.update(state)
+        self._init_ttl()
+        self.set_many(items)
+
+    def copy(self):
+        """Return a shallow copy with the same capacity and ttl."""
+        func, args, state = self.__reduce__()
+        out = func(*args)
+        out.__setstate__(state)
+        return out
+
+    def get_many(self, keys):
+        """Get a list of the values for ``keys``, marking each key as recently used.
+
+        This is equivalent to ``[d[key] for key in keys]`` but faster.
+
+        Parameters:
+        -----------
+        keys : iterable
+            Keys to get.
+
+        Returns:
+        --------
+        list
+            Values for ``keys``.
+        """
+        values = []
+        for key in keys:
+            values.append(_odict_getitem(self, key))
+            _odict_move_to_end(self, key)
+        return values
+
+    def set_many(self, items):
+        """Set multiple items, evicting least recently used items only at the end.
+
+        The result is the same as setting each item in turn.
+
+        Parameters:
+        -----------
+        items : dict or iterable of (key, value) pairs
+            Items to set.
+        """
+        if hasattr(items, "keys"):
+            items = items.items()
+        for key, value in items:
+            _odict_setitem(self, key, value)
+            _odict_move_to_end(self, key)
+        while len(self) > self.capacity:
+            self.popitem(last=False)
+
+
+@functools.cache
+def _timed_lru_dict_class(cls):
+    """Get the subclass of LRUDict (sub)class ``cls`` that handles item expiration.
+
+    This keeps the methods of any user subclass of LRUDict when a ttl is set.
+    """
+    return type(f"_Timed{cls.__name__}", (_TimedLRUDictMixin, cls), {"_lru_class": cls})
+
+
+class _TimedLRUDictMixin:
+    """Mixin for an LRUDict where items expire ``ttl`` seconds after being set.
+
+    Expiration times are tracked in a min-heap of ``(expires, count, key)`` so that
+    finding expired items is O(log n) instead of a scan. Heap entries whose expiration
+    no longer matches ``_expires[key]`` are stale (the key was set again or removed)
+    and are discarded when they reach the top of the heap.
+    """
+
+    def _init_expires(self):
+        self._expires = {}
+        self._expires_heap = []
+        self._expires_count = 0
+
+    def _remove_expired(self):
+        now = time.monotonic()
+        heap = self._expires_heap
+        while heap and heap[0][0] <= now:
+            expires, _, key = heapq.heappop(heap)
+            if self._expires.get(key) == expires:
+                del self._expires[key]
+                if OrderedDict.__contains__(self, key):
+                    OrderedDict.__delitem__(self, key)
+
+    def __contains__(self, key):
+        self._remove_expired()
+        return super().__contains__(key)
+
+    def __getitem__(self, key):
+        self._remove_expired()
+        return super().__getitem__(key)
+
+    def __setitem__(self, key, value):
+        # Remove expired items first so they are evicted in preference to the least
+        # recently used item.
+        self._remove_expired()
+        expires = time.monotonic() + self.ttl
+        self._expires[key] = expires
+        self._expires_count += 1
+        heap = self._expires_heap
+        heapq.heappush(heap, (expires, self._expires_count, key))
         super().__setitem__(key, value)
-        if len(self) > self.capacity:
-            oldest = next(iter(self))
-            del self[oldest]
+
+        # Drop stale heap entries once they dominate to keep the heap size bounded.
+        if len(heap) > 2 * len(self._expires) + 16:
+            heap[:] = [item for item in heap if self._expires.get(item[2]) == item[0]]
+            heapq.heapify(heap)
+
+    def __reduce__(self):
+        # Items in the copy get a new full ttl, so drop those already expired.
+        self._remove_expired()
+        return super().__reduce__()
+
+    def get_many(self, keys):
+        self._remove_expired()
+        return super().get_many(keys)
+
+    def set_many(self, items):
+        if hasattr(items, "keys"):
+            items = items.items()
+        for key, value in items:
+            self[key] = value
+
+    def get(self, key, default=None):
+        self._remove_expired()
+        return super().get(key, default)
+
+    def pop(self, key, *args):
+        self._remove_expired()
+        value = super().pop(key, *args)
+        self._expires.pop(key, None)
+        return value
+
+    def setdefault(self, key, default=None):
+        # Set through __setitem__ so a new item gets an expiration time
+        if key not in self:
+            self[key] = default
+        return _odict_getitem(self, key)
+
+    def clear(self):
+        super().clear()
+        self._init_expires()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._expires.pop(key, None)
+
+    def popitem(self, last=True):
+        key, value = super().popitem(last=last)
+        self._expires.pop(key, None)
+        return key, value
 
 
 @contextlib.contextmanager
@@ -405,10 +745,20 @@ def temp_env_var(name, value):
     try:
         yield
     finally:
-        if original_value is not None:
-            os.environ[name] = original_value
+        if original_value is None:
+            # Use pop in case the variable was already deleted within the block
+            os.environ.pop(name, None)
         else:
-            del os.environ[name]
+            os.environ[name] = original_value
+
+
+# Pattern that matches every string (without "_" digit separators) that float() can
+# convert. This is used to avoid raising and catching an exception for strings that
+# are certainly not numbers.
+_FLOAT_MATCH = re.compile(
+    r"\s*[+-]?(?:(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?|inf|infinity|nan)\s*",
+    re.IGNORECASE,
+).fullmatch
 
 
 def convert_to_int_float_str(val: str) -> int | float | str:
@@ -438,26 +788,42 @@ def convert_to_int_float_str(val: str) -> int | float | str:
     and to avoid confusion in Python a leading 0 is not allowed in a decimal integer
     literal.
     """
-    import ast
-
     if not isinstance(val, str):
         raise TypeError(f"input value must be a string, not {type(val).__name__}")
 
+    # int() and float() also accept "_" separators like "1_000", so always try those.
+    has_underscore = "_" in val
+
+    # Any other string accepted by int() is decimal digits after stripping whitespace
+    # and the sign.
+    if has_underscore or val.strip().lstrip("+-").isdecimal():
+        try:
+            return int(val)
+        except ValueError:
+            pass
+
+    if has_underscore or _FLOAT_MATCH(val):
+        try:
+            return float(val)
+        except ValueError:
+            pass
+
+    # Only a string literal is accepted from literal_eval and that must contain a
+    # quote, so skip the relatively expensive parse otherwise.
+    if "'" not in val and '"' not in val:
+        return val
+
+    import ast
+
     try:
-        out = int(val)
+        # Handle an input like "'string'"
+        out = ast.literal_eval(val)
+        if not isinstance(out, str):
+            # If this wasn't a string literal (e.g. "[1]" then raise and return
+            # the original string.
+            raise ValueError
     except Exception:
-        try:
-            out = float(val)
-        except Exception:
-            try:
-                # Handle an input like "'string'"
-                out = ast.literal_eval(val)
-                if not isinstance(out, str):
-                    # If this wasn't a string literal (e.g. "[1]" then raise and return
-                    # the original string.
-                    raise ValueError
-            except Exception:
-                out = val
+        out = val
 
     return out
 
@@ -6,11 +6,13 @@ installed, and `setuptools_scm <https://github.com/pypa/setuptools_scm/>`_
 otherwise.
 """
 
-import importlib
+import functools
+import importlib.util
 import io
 import logging
 import os
 import re
+import sys
 import warnings
 from pathlib import Path
 
@@ -25,6 +27,14 @@ with warnings.catch_warnings():
     from importlib import resources, metadata
 
 
+# Version string in the default setuptools_scm scheme, used by parse_version()
+_VERSION_RE = re.compile(
+    r"(?P<major>[0-9]+)(?:\.(?P<minor>[0-9]+))?(?:\.(?P<patch>[0-9]+))?"
+    r"(?:\.dev(?P<distance>[0-9]+))?"
+    r"(?:\+(?P<letter>\S)g?(?P<hash>\S+)\.(?:d(?P<date>[0-9]+))?)?"
+)
+
+
 def get_version_logger(level_stdout, level_string):
     logger_string = io.StringIO()
     hdlr_stdout = logging.StreamHandler()
@@ -42,12 +52,16 @@ def get_version_logger(level_stdout, level_string):
     return logger, logger_string
 
 
+@functools.cache
 def get_version(package, distribution=None):
     """Get version string for ``package`` with optional ``distribution`` name.
 
     If the package is not from an installed distribution then get version from
     git using setuptools_scm.
 
+    The result is cached, so subsequent calls for the same ``package`` and
+    ``distribution`` return the same version string without repeating the lookup.
+
     Parameters
     ----------
     package :
@@ -61,17 +75,24 @@ def get_version(package, distribution=None):
         Version string
 
     """
-    import sys
-
     # Configure environment for Ska3 runtime. This is a bit of a hack but get_version()
     # is a convenient place to do this because it is called by every Ska3 package
     # on import.
     configure_ska_environment()
 
-    level_stdout = "DEBUG" if "SKA_HELPERS_VERSION_DEBUG" in os.environ else "INFO"
-    level_string = "DEBUG"
-    logger, logger_string = get_version_logger(level_stdout, level_string)
-    log = logger.debug
+    # Collect log messages for the warning issued if getting the version fails. Only
+    # set up a logger to also print them if debug output is requested, since this is
+    # the uncommon case and creating the logger is relatively slow.
+    log_lines = []
+    if "SKA_HELPERS_VERSION_DEBUG" in os.environ:
+        logger, _ = get_version_logger(level_stdout="DEBUG", level_string="DEBUG")
+
+        def log(msg):
+            log_lines.append(msg)
+            logger.debug(msg)
+
+    else:
+        log = log_lines.append
 
     log("*" * 80)
     log(f"Getting version for package={package} distribution={distribution} ")
@@ -79,7 +100,7 @@ def get_version(package, distribution=None):
     log(f"  {sys.path=}")
 
     # Get module file for package.
-    module_file = importlib.util.find_spec(package, distribution).origin
+    module_file = importlib.util.find_spec(package).origin
     log(f"  {module_file=}")
 
     # From this point guarantee tha a version string is returned.
@@ -103,8 +124,8 @@ def get_version(package, distribution=None):
             # version just corresponds to whatever version was the
             # last run of "setup.py sdist" or "setup.py bdist_wheel", i.e.
             # unrelated to current version, so ignore in this case.
-            git_dir = location.parent / ".git"
-            bad = git_dir.exists() and git_dir.is_dir()
+            # is_dir() is False if the path does not exist, so one stat is enough.
+            bad = (location.parent / ".git").is_dir()
             if bad:
                 log(
                     "    WARNING: distinfo.location is git repo (version likely wrong), "
@@ -117,7 +138,7 @@ def get_version(package, distribution=None):
         except (metadata.PackageNotFoundError, AssertionError):
             # metadata.version failed or found a different package from this
             # file, try getting version from source repo.
-            from setuptools_scm import get_version
+            from setuptools_scm import get_version as scm_get_version
 
             log("  Getting version via setuptools_scm for git repo")
 
@@ -130,13 +151,12 @@ def get_version(package, distribution=None):
             log(f"        root={Path(*roots)},")
             log(f"        relative_to={module_file}")
             log(f"    )")
-            version = get_version(root=Path(*roots), relative_to=module_file)
+            version = scm_get_version(root=Path(*roots), relative_to=module_file)
 
     except Exception:
         # Something went wrong. The ``get_version` function should never block
         # import but generate a lot of output indicating the problem.
         import traceback
-        import warnings
 
         version = "0.0.0"
         log(f"WARNING: got {version=}")
@@ -157,7 +177,7 @@ def get_version(package, distribution=None):
 
             warnings.warn(traceback.format_exc() + "\n\n")
             warnings.warn("Failed to find a package version, setting to 0.0.0")
-            warnings.warn(logger_string.getvalue())
+            warnings.warn("".join(line + "\n" for line in log_lines))
 
     else:
         # No exception, so we got a valid version string.
@@ -182,15 +202,11 @@ def parse_version(version):
         version information
 
     """
-    fmt = (
-        r"(?P<major>[0-9]+)(.(?P<minor>[0-9]+))?(.(?P<patch>[0-9]+))?"
-        r"(.dev(?P<distance>[0-9]+))?"
-        r"(\+(?P<letter>\S)g?(?P<hash>\S+)\.(d(?P<date>[0-9]+))?)?"
-    )
-    m = re.match(fmt, version)
+    m = _VERSION_RE.match(version)
     if not m:
         raise RuntimeError(f"version {version} could not be parsed")
     result = m.groupdict()
     for k in ["major", "minor", "patch", "distance"]:
-        result[k] = eval(f"{result[k]}")
+        if result[k] is not None:
+            result[k] = int(result[k])
     return result